@@ -4,7 +4,6 @@ add_python_test(submission PLUGIN ${PLUGIN})
 add_python_test(challenge PLUGIN ${PLUGIN})
 add_python_test(challenge_timeframe PLUGIN ${PLUGIN})
 add_python_test(phase PLUGIN ${PLUGIN})
-add_python_test(user_emails PLUGIN ${PLUGIN})
 add_python_test(asset_folder PLUGIN ${PLUGIN})
 add_python_test(submission_folder_access PLUGIN ${PLUGIN})
 add_python_style_test(python_static_analysis_covalic
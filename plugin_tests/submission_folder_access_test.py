@@ -17,6 +17,7 @@
 #  limitations under the License.
 ###############################################################################
 
+import mock
 import six
 
 from tests import base
@@ -191,3 +192,102 @@ class SubmissionFolderAccessTestCase(base.TestCase):
         # submission folder has been deleted
         folderModel.remove(submissionFolder)
         phaseModel.setUserAccess(phase, phaseAdmin1, None, save=True)
+
+    def _createPhaseWithAdmins(self):
+        """
+        Create a phase with two phase admins and a participant, and return
+        them along with the phase.
+        """
+        phaseAdmin1 = self.model('user').createUser(
+            email='phase1@email.com', login='phase1',
+            firstName='Phase', lastName='Admin 1', password='passwd')
+        phaseAdmin2 = self.model('user').createUser(
+            email='phase2@email.com', login='phase2',
+            firstName='Phase', lastName='Admin 2', password='passwd')
+        user1 = self.model('user').createUser(
+            email='user1@email.com', login='user1',
+            firstName='User', lastName='1', password='passwd')
+
+        challenge = self.model('challenge', 'covalic').createChallenge(
+            name='challenge 1', creator=phaseAdmin1, public=False)
+        phase = self.model('phase', 'covalic').createPhase(
+            name='phase 1', challenge=challenge, creator=phaseAdmin1,
+            ordinal=1)
+        self.model('phase', 'covalic').setUserAccess(
+            phase, phaseAdmin2, AccessType.WRITE, save=True)
+
+        return phase, phaseAdmin1, phaseAdmin2, user1
+
+    def _createSubmission(self, phase, user, name):
+        folder = self.model('folder').createFolder(
+            parent=user, name=name, parentType='user', creator=user)
+        return self.model('submission', 'covalic').createSubmission(
+            creator=user, phase=phase, folder=folder)
+
+    def testSubmissionFolderAccessChunks(self):
+        from girder.plugins.covalic.models import submission as submissionModule
+
+        folderModel = self.model('folder')
+        submissionModel = self.model('submission', 'covalic')
+        phase, phaseAdmin1, phaseAdmin2, user1 = self._createPhaseWithAdmins()
+
+        submissions = [
+            self._createSubmission(phase, user1, 'submission 1'),
+            self._createSubmission(phase, user1, 'submission 2')
+        ]
+
+        # Revoke phaseAdmin2's access on both folders so that they need to be
+        # updated
+        for submission in submissions:
+            folder = folderModel.load(submission['folderId'], force=True)
+            folderModel.setUserAccess(folder, phaseAdmin2, None, save=True)
+
+        # Process one submission per chunk; each chunk writes its own folders
+        with mock.patch.object(submissionModule, 'FOLDER_ACCESS_CHUNK_SIZE', 1), \
+                mock.patch.object(folderModel.collection, 'bulk_write',
+                                  wraps=folderModel.collection.bulk_write) as bulkWrite:
+            submissionModel.updateFolderAccess(phase, iter(submissions))
+        self.assertEqual(bulkWrite.call_count, 2)
+
+        for submission in submissions:
+            folder = folderModel.load(submission['folderId'], force=True)
+            self._filterUserAccessKeys(folder)
+            six.assertCountEqual(self, folder['access']['users'], [
+                {'id': user1['_id'], 'level': AccessType.ADMIN},
+                {'id': phaseAdmin1['_id'], 'level': AccessType.READ},
+                {'id': phaseAdmin2['_id'], 'level': AccessType.READ}
+            ])
+
+    def testSubmissionFolderAccessUnchanged(self):
+        folderModel = self.model('folder')
+        submissionModel = self.model('submission', 'covalic')
+        phase, phaseAdmin1, phaseAdmin2, user1 = self._createPhaseWithAdmins()
+
+        submission = self._createSubmission(phase, user1, 'submission 1')
+
+        # The folder ACL already matches the phase admins, so nothing is written
+        with mock.patch.object(folderModel.collection, 'bulk_write') as bulkWrite:
+            submissionModel.updateFolderAccess(phase, (submission,))
+        bulkWrite.assert_not_called()
+
+        # Give phaseAdmin2 the wrong access level on the folder; only that
+        # admin should be reset to read access
+        folder = folderModel.load(submission['folderId'], force=True)
+        folderModel.setUserAccess(
+            folder, phaseAdmin2, AccessType.WRITE, save=True)
+
+        with mock.patch.object(folderModel, 'setUserAccess',
+                               wraps=folderModel.setUserAccess) as setUserAccess:
+            submissionModel.updateFolderAccess(phase, (submission,))
+        self.assertEqual(setUserAccess.call_count, 1)
+        args = setUserAccess.call_args[0]
+        self.assertEqual(args[1]['_id'], phaseAdmin2['_id'])
+        self.assertEqual(args[2], AccessType.READ)
+
+        folder = folderModel.load(submission['folderId'], force=True)
+        self._filterUserAccessKeys(folder)
+        six.assertCountEqual(self, folder['access']['users'], [
+            {'id': user1['_id'], 'level': AccessType.ADMIN},
+            {'id': phaseAdmin1['_id'], 'level': AccessType.READ},
+            {'id': phaseAdmin2['_id'], 'level': AccessType.READ}
+        ])
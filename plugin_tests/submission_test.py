@@ -19,7 +19,9 @@
 
 import json
 import mock
+import six
 
+from girder.exceptions import GirderException
 from tests import base
 
 
@@ -346,6 +348,49 @@ class SubmissionModelTest(SubmissionBase):
         job = self.model('job', 'jobs').load(submission['jobId'], force=True)
         self.assertIsNotNone(job)
 
+    def _scoringTokenUserId(self, submission):
+        job = self.model('job', 'jobs').load(submission['jobId'], force=True)
+        tokenId = job['kwargs']['outputs']['_stdout']['headers']['Girder-Token']
+        token = self.model('token').load(tokenId, force=True, objectId=False)
+        return token['userId']
+
+    def testScoreSubmissionScoringUserChange(self):
+        from girder.plugins.covalic.constants import PluginSettings
+        from girder.plugins.covalic.models.submission import _scoreUserCache
+
+        submissionModel = self.model('submission', 'covalic')
+
+        submission = self.createSubmission(self.phase1, self.user, 'submission 1')
+        submission = submissionModel.scoreSubmission(
+            submission, 'http://127.0.0.1/api/v1')
+        self.assertEqual(
+            self._scoringTokenUserId(submission), self.scoringUser['_id'])
+
+        # Changing the setting should switch the user scoring submissions
+        scoringUser2 = self.model('user').createUser(
+            email='scoring2@email.com', login='scoring2login',
+            firstName='First', lastName='Last', password='scoringpassword')
+        self.model('setting').set(
+            PluginSettings.SCORING_USER_ID, scoringUser2['_id'])
+
+        submission = self.createSubmission(self.phase1, self.user, 'submission 2')
+        submission = submissionModel.scoreSubmission(
+            submission, 'http://127.0.0.1/api/v1')
+        self.assertEqual(
+            self._scoringTokenUserId(submission), scoringUser2['_id'])
+        self.assertEqual(_scoreUserCache['id'], scoringUser2['_id'])
+
+        # Removing the scoring user should clear the cached user
+        self.model('user').remove(scoringUser2)
+        self.assertIsNone(_scoreUserCache['id'])
+        self.assertIsNone(_scoreUserCache['user'])
+
+        submission = self.createSubmission(self.phase1, self.user, 'submission 3')
+        with six.assertRaisesRegex(self, GirderException,
+                                   'Invalid scoring user setting'):
+            submissionModel.scoreSubmission(
+                submission, 'http://127.0.0.1/api/v1')
+
 
 class SubmissionRestTest(SubmissionBase):
     def setUp(self):
@@ -650,6 +695,44 @@ class SubmissionRestTest(SubmissionBase):
             }]
         }])
 
+    def testPostInvalidScore(self):
+        submission = self.createSubmission(self.phase1, self.user, 'submission')
+
+        # metrics are required for each dataset
+        resp = self.request(
+            path='/covalic_submission/%s/score' % str(submission['_id']),
+            method='POST', user=self.admin,
+            body=json.dumps([{'dataset': 'dataset1'}]), type='application/json'
+        )
+        self.assertStatus(resp, 400)
+        self.assertIn('Invalid JSON object for parameter score',
+                      resp.json['message'])
+
+        # request body too large
+        resp = self.request(
+            path='/covalic_submission/%s/score' % str(submission['_id']),
+            method='POST', user=self.admin,
+            body=json.dumps([{
+                'dataset': 'x' * (8 * 1024 * 1024),
+                'metrics': []
+            }]),
+            type='application/json'
+        )
+        self.assertStatus(resp, 413)
+        self.assertEqual(resp.json['message'], 'Score is too large.')
+
+        # too many datasets
+        resp = self.request(
+            path='/covalic_submission/%s/score' % str(submission['_id']),
+            method='POST', user=self.admin,
+            body=json.dumps([{'dataset': 'dataset', 'metrics': []}] * 10001),
+            type='application/json'
+        )
+        self.assertStatus(resp, 413)
+
+        submission = self.model('submission', 'covalic').load(submission['_id'])
+        self.assertNotIn('score', submission)
+
     def testPostRescore(self):
         submission1 = self.createSubmission(self.phase1, self.user, 'submission1')
         submission2 = self.createSubmission(self.phase1, self.user, 'submission2')
@@ -17,12 +17,12 @@
 #  limitations under the License.
 ###############################################################################
 
+from girder import events
 from girder.api.v1 import resource
 
 
 from girder.utility.model_importer import ModelImporter
 from girder.utility.plugin_utilities import registerPluginWebroot
-from .rest import challenge, phase, submission
 from .constants import PluginSettings, JOB_LOG_PREFIX
 from .utility import getAssetsFolder
 
@@ -42,7 +42,26 @@ class CustomAppRoot(ModelImporter):
     }
 
 
+def onSettingChange(event):
+    """
+    Drop the cached scoring user when the scoring user setting changes.
+    """
+    if event.info.get('key') == PluginSettings.SCORING_USER_ID:
+        from .models.submission import clearScoreUserCache
+        clearScoreUserCache()
+
+
+def onUserRemove(event):
+    """
+    Drop the cached scoring user in case it was the user that was removed.
+    """
+    from .models.submission import clearScoreUserCache
+    clearScoreUserCache()
+
+
 def load(info):
+    from .rest import challenge, phase, submission
+
     resource.allowedSearchTypes.add('challenge.covalic')
 
     info['apiRoot'].challenge = challenge.Challenge()
@@ -51,3 +70,7 @@ def load(info):
 
     registerPluginWebroot(CustomAppRoot(), info['name'])
 
+    events.bind('model.setting.save.after', 'covalic', onSettingChange)
+    events.bind('model.setting.remove', 'covalic', onSettingChange)
+    events.bind('model.user.remove', 'covalic', onUserRemove)
+
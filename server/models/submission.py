@@ -18,6 +18,10 @@
 ###############################################################################
 
 import datetime
+import itertools
+import threading
+
+from pymongo import UpdateOne
 
 from girder.constants import AccessType
 from girder.exceptions import GirderException
@@ -28,6 +32,36 @@ from girder.plugins.worker import utils
 
 from ..constants import PluginSettings
 
+# Number of submissions whose folder access is synchronized at once
+FOLDER_ACCESS_CHUNK_SIZE = 500
+
+# The scoring user document and the setting value it was loaded for, cached
+# per process by scoreSubmission. The setting is still read on every call, so
+# a change made by any server process is seen. Removing the scoring user is
+# only seen by the process that removed it, through clearScoreUserCache; other
+# processes keep the cached user until the setting changes. The generation is
+# bumped on every clear so that a load racing with a clear is not cached.
+_scoreUserLock = threading.Lock()
+_scoreUserCache = {'generation': 0, 'id': None, 'user': None}
+
+
+def clearScoreUserCache():
+    """Clear the cached scoring user, e.g. after the setting has changed."""
+    with _scoreUserLock:
+        _scoreUserCache['generation'] += 1
+        _scoreUserCache['id'] = None
+        _scoreUserCache['user'] = None
+
+
+def _hasUserAccess(doc, userId, level):
+    """
+    Check whether a document's ACL grants a user at least the given access
+    level directly. Unlike hasAccess, this does not consider group access or
+    site admin status, and does no database access.
+    """
+    return any(user['id'] == userId and user['level'] >= level
+               for user in doc.get('access', {}).get('users', []))
+
 
 class Submission(Model):
     @staticmethod
@@ -41,8 +75,10 @@ class Submission(Model):
             ('phaseId', 1), ('overallScore', -1), ('approach', 1), ('latest', 1)
         ], {})
         userPhaseIdx = ([('creatorId', 1), ('phaseId', 1), ('approach', 1)], {})
-        self.ensureIndices((leaderboardIdx, userPhaseIdx, 'folderId',
-                            'overallScore', 'approach'))
+        # No query filters on folderId, and phaseId lookups are served by the
+        # leaderboard index prefix, so neither gets an index of its own
+        self.ensureIndices((leaderboardIdx, userPhaseIdx, 'overallScore',
+                            'approach'))
         self.exposeFields(level=AccessType.READ, fields=(
             '_id', 'creatorId', 'creatorName', 'phaseId', 'folderId', 'created',
             'score', 'title', 'latest', 'overallScore', 'jobId','approach', 'meta'
@@ -63,12 +99,12 @@ class Submission(Model):
             doc['overallScore'] = scoring.computeOverallScore(doc, phase)
             doc['latest'] = True
 
-            Model.update(self, query={
+            self.collection.update_many({
                 'phaseId': doc['phaseId'],
                 'creatorId': doc['creatorId'],
                 'approach': doc.get('approach'),
                 'latest': True
-            }, update={
+            }, {
                 '$set': {'latest': False}
             })
 
@@ -82,12 +118,15 @@ class Submission(Model):
             'creatorName': self.getUserName(creator),
             'phaseId': phase['_id'],
             'folderId': folder['_id'],
-            'created': created or datetime.datetime.utcnow(),
-            'score': None,
-            'title': title,
-            'meta': meta or {}
+            'created': created or datetime.datetime.utcnow()
         }
 
+        # Leave unset fields out of the document; a missing score, title or
+        # meta is read as unset
+        if title is not None:
+            submission['title'] = title
+        if meta:
+            submission['meta'] = meta
 
         if job is not None:
             submission['jobId'] = job['_id']
@@ -96,13 +135,44 @@ class Submission(Model):
         self.updateFolderAccess(phase, (submission,))
         return submission
 
+    def setScore(self, submission, score):
+        """
+        Record a score for a submission, computing its overall score and
+        marking it as the latest scored submission. Only the fields affected by
+        scoring are written.
+
+        :param submission: The submission.
+        :type submission: dict
+        :param score: The score posted by the scoring job.
+        :type score: list
+        :returns: The updated submission.
+        """
+        submission.pop('overallScore', None)
+        submission['score'] = score
+        submission = self.validate(submission)
+
+        self.collection.update_one({'_id': submission['_id']}, {
+            '$set': {
+                'score': submission['score'],
+                'overallScore': submission['overallScore'],
+                'latest': submission['latest']
+            }
+        })
+        return submission
+
     def updateFolderAccess(self, phase, submissions):
         """
         Synchronize access control between the phase and submission folders for
         the phase. Phase admins should have read access on the submission
         folders.
+
+        :param phase: The phase.
+        :type phase: dict
+        :param submissions: The submissions to update. This may be a cursor;
+            it is consumed in chunks of FOLDER_ACCESS_CHUNK_SIZE. Only the
+            'folderId' field is read, so callers querying submissions may
+            project to that field.
         """
-        folderModel = self.model('folder')
         userModel = self.model('user')
         phaseModel = self.model('phase', 'covalic')
 
@@ -111,39 +181,135 @@ class Submission(Model):
         phaseAdminUserIds = set([user['id']
                                  for user in phaseAcl.get('users')
                                  if user['level'] >= AccessType.WRITE])
-        phaseAdminUsers = [userModel.load(userId, force=True, exc=True)
-                           for userId in phaseAdminUserIds]
+        phaseAdminUsers = list(userModel.find(
+            {'_id': {'$in': list(phaseAdminUserIds)}}, fields=['_id']))
 
-        # Update submission folder ACL for current phase admins
+        # Update submission folder ACL for current phase admins, one chunk of
+        # submissions at a time to bound memory use for large phases
         try:
-            for sub in submissions:
-                folder = folderModel.load(sub['folderId'], force=True)
-                if not folder:
-                    continue
-                folderAcl = folderModel.getFullAccessList(folder)
-
-                # Revoke access to users who are not phase admins; ignore folder
-                # owner
-                usersToRemove = [userModel.load(user['id'], force=True,
-                                                exc=True)
-                                 for user in folderAcl.get('users')
-                                 if (user['id'] not in phaseAdminUserIds and
-                                     user['id'] != folder['creatorId'])]
-                for user in usersToRemove:
-                    folderModel.setUserAccess(folder, user, None)
-
-                # Add access to phase admins; ignore folder owner
-                usersToAdd = [user for user in phaseAdminUsers
-                              if user['_id'] != folder['creatorId']]
-                for user in usersToAdd:
-                    folderModel.setUserAccess(folder, user, AccessType.READ)
-
-                # Save folder if access changed
-                if usersToRemove or usersToAdd:
-                    folderModel.save(folder, validate=False)
+            submissions = iter(submissions)
+            while True:
+                chunk = list(itertools.islice(
+                    submissions, FOLDER_ACCESS_CHUNK_SIZE))
+                if not chunk:
+                    break
+                self._updateFolderAccessChunk(
+                    chunk, phaseAdminUserIds, phaseAdminUsers)
         except TypeError:
             raise ValidationException('A list of submissions is required.')
 
+    def _updateFolderAccessChunk(self, submissions, phaseAdminUserIds,
+                                 phaseAdminUsers):
+        """
+        Synchronize submission folder access for a list of submissions. See
+        updateFolderAccess.
+
+        :param submissions: The submissions to process.
+        :type submissions: list
+        :param phaseAdminUserIds: The IDs of the phase admin users.
+        :type phaseAdminUserIds: set
+        :param phaseAdminUsers: The phase admin user documents.
+        :type phaseAdminUsers: list
+        """
+        folderModel = self.model('folder')
+
+        foldersById = {
+            folder['_id']: folder for folder in folderModel.find(
+                {'_id': {'$in': [sub['folderId'] for sub in submissions]}})
+        }
+
+        updates = []
+        for sub in submissions:
+            folder = foldersById.get(sub['folderId'])
+            if not folder:
+                continue
+
+            # Skip the folder if phase admins already have exactly read access;
+            # ignore folder owner. This only reads the stored ACL.
+            currentAccess = {user['id']: user['level']
+                             for user in folder.get('access', {}).get('users', [])
+                             if user['id'] != folder['creatorId']}
+            targetAccess = {user['_id']: AccessType.READ
+                            for user in phaseAdminUsers
+                            if user['_id'] != folder['creatorId']}
+            if currentAccess == targetAccess:
+                continue
+
+            # The full access list loads each user in the ACL and drops those
+            # that no longer exist
+            folderAcl = folderModel.getFullAccessList(folder)
+            currentAccess = {user['id']: user['level']
+                             for user in folderAcl.get('users')
+                             if user['id'] != folder['creatorId']}
+
+            # Revoke access to users who are not phase admins; ignore folder
+            # owner. setUserAccess only needs the user ID.
+            usersToRemove = [{'_id': userId} for userId in currentAccess
+                             if userId not in phaseAdminUserIds]
+            for user in usersToRemove:
+                folderModel.setUserAccess(folder, user, None)
+
+            # Add access to phase admins who don't have exactly read access;
+            # ignore folder owner
+            usersToAdd = [user for user in phaseAdminUsers
+                          if user['_id'] in targetAccess and
+                          currentAccess.get(user['_id']) != AccessType.READ]
+            for user in usersToAdd:
+                folderModel.setUserAccess(folder, user, AccessType.READ)
+
+            # Save folder if access changed
+            if usersToRemove or usersToAdd:
+                updates.append(UpdateOne(
+                    {'_id': folder['_id']},
+                    {'$set': {'access': folder['access']}}))
+
+        if updates:
+            folderModel.collection.bulk_write(updates, ordered=False)
+
+    @staticmethod
+    def _ensureAccess(model, doc, user, level):
+        """
+        Grant a user at least the given access level on a document, unless
+        the document's ACL already does. The document is not saved.
+
+        :param model: The access controlled model of the document.
+        :param doc: The document.
+        :type doc: dict
+        :param user: The user.
+        :type user: dict
+        :param level: The minimum access level.
+        :type level: girder.AccessType
+        :returns: Whether the document's ACL was changed.
+        """
+        if _hasUserAccess(doc, user['_id'], level):
+            return False
+        model.setUserAccess(doc, user=user, level=level)
+        return True
+
+    def _getScoreUser(self, scoreUserId):
+        """
+        Get the scoring user, using the cached user document if it was loaded
+        for the same setting value.
+
+        :param scoreUserId: The current scoring user ID setting.
+        :returns: The scoring user, or None if the user does not exist.
+        """
+        with _scoreUserLock:
+            generation = _scoreUserCache['generation']
+            cachedId = _scoreUserCache['id']
+            cachedUser = _scoreUserCache['user']
+
+        if cachedUser is not None and str(cachedId) == str(scoreUserId):
+            return cachedUser
+
+        scoreUser = self.model('user').load(scoreUserId, force=True)
+        if scoreUser is not None:
+            with _scoreUserLock:
+                if _scoreUserCache['generation'] == generation:
+                    _scoreUserCache['id'] = scoreUserId
+                    _scoreUserCache['user'] = scoreUser
+        return scoreUser
+
     def scoreSubmission(self, submission, apiUrl):
         """
         Run a Girder Worker job to score a submission.
@@ -173,23 +339,25 @@ class Submission(Model):
             raise GirderException(
                 'No scoring user ID is set. Please set one on the plugin configuration page.')
 
-        scoreUser = userModel.load(scoreUserId, force=True)
+        scoreUser = self._getScoreUser(scoreUserId)
         if not scoreUser:
             raise GirderException('Invalid scoring user setting (%s).' % scoreUserId)
 
         scoreToken = tokenModel.createToken(user=scoreUser, days=7)
-        folderModel.setUserAccess(
-            folder, user=scoreUser, level=AccessType.READ, save=True)
 
         groundTruth = folderModel.load(phase['groundTruthFolderId'], force=True)
 
-        if not phaseModel.hasAccess(phase, user=scoreUser, level=AccessType.ADMIN):
-            phaseModel.setUserAccess(
-                phase, user=scoreUser, level=AccessType.ADMIN, save=True)
-
-        if not folderModel.hasAccess(groundTruth, user=scoreUser, level=AccessType.READ):
-            folderModel.setUserAccess(
-                groundTruth, user=scoreUser, level=AccessType.READ, save=True)
+        # Grant the scoring user access to the data it reads and the phase it
+        # posts scores to, only writing the documents whose ACL changed
+        folderUpdates = [
+            UpdateOne({'_id': doc['_id']}, {'$set': {'access': doc['access']}})
+            for doc in (folder, groundTruth)
+            if self._ensureAccess(folderModel, doc, scoreUser, AccessType.READ)]
+        if folderUpdates:
+            folderModel.collection.bulk_write(folderUpdates, ordered=False)
+
+        if self._ensureAccess(phaseModel, phase, scoreUser, AccessType.ADMIN):
+            phaseModel.save(phase)
 
         task = phase.get('scoreTask', {})
         #image = task.get('dockerImage') or 'girder/covalic-metrics:latest'
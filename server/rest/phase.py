@@ -103,9 +103,8 @@ class Phase(Resource):
         else:
             group = None
 
-        ordinal = len([self.model('phase', 'covalic').filter(p, user)
-                       for p in self.model('phase', 'covalic').list(
-                           challenge, user=user)])
+        ordinal = self.model('phase', 'covalic').collection.count_documents(
+            {'challengeId': challenge['_id']})
 
         startDate = params.get('startDate')
         endDate = params.get('endDate')
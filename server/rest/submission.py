@@ -18,17 +18,51 @@
 ###############################################################################
 
 import cherrypy
-import os
+import jsonschema
 
 from ..models.phase import Phase
-from ..models.submission import Submission
+from ..models.submission import Submission as SubmissionModel
 from girder.api import access
 from girder.api.describe import Description, autoDescribeRoute, describeRoute
 from girder.api.rest import Resource, filtermodel, loadmodel
 from girder.constants import AccessType, SortDir
-from girder.exceptions import AccessException, GirderException, RestException, ValidationException
+from girder.exceptions import GirderException, RestException, ValidationException
 from girder.models.folder import Folder
 
+_SCORE_SCHEMA = {
+    '$schema': 'http://json-schema.org/schema#',
+    'type': 'array',
+    'items': {'$ref': '#/definitions/score'},
+    'definitions': {
+        'score': {
+            'type': 'object',
+            'properties': {
+                'dataset': {'type': 'string'},
+                'metrics': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/metric'}
+                }
+            },
+            'required': ['dataset', 'metrics']
+        },
+        'metric': {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'value': {'type': ['null', 'number', 'string']}
+            },
+            'required': ['name', 'value']
+        }
+    }
+}
+
+# Compiled once, rather than on every request as a jsonParam schema would be
+_SCORE_VALIDATOR = jsonschema.Draft4Validator(_SCORE_SCHEMA)
+
+# Limits on posted scores, well below MongoDB's 16 MB document size limit
+_MAX_SCORE_BODY_SIZE = 8 * 1024 * 1024
+_MAX_SCORE_DATASETS = 10000
+
 
 class Submission(Resource):
     def __init__(self):
@@ -36,6 +70,12 @@ class Submission(Resource):
 
         self.resourceName = 'covalic_submission'
 
+        # Models are singletons, so they can be resolved once up front
+        self._submissionModel = self.model('submission', 'covalic')
+        self._phaseModel = self.model('phase', 'covalic')
+        self._userModel = self.model('user')
+        self._tokenModel = self.model('token')
+
         self.route('POST', (), self.postSubmission)
         self.route('POST', (':id', 'score'), self.postScore)
 
@@ -51,22 +91,8 @@ class Submission(Resource):
         if phase.get(requireOptionName, False):
             self.requireParams(paramName, params)
 
-    def _getStrippedParam(self, params, name):
-        """
-        Return the stripped parameter, or None if the parameter doesn't exist.
-
-        :param params: Parameters.
-        :param name: Parameter name.
-        :return: The stripped parameter, or None.
-        """
-        param = params.get(name)
-        if param is not None:
-            param = param.strip()
-        return param
-
-
     @access.public
-    @filtermodel(model=Submission)
+    @filtermodel(model=SubmissionModel)
     @autoDescribeRoute(
         Description('Make a submission to the challenge.')
         .modelParam('phaseId', 'The ID of the challenge phase to submit to.',
@@ -97,17 +123,16 @@ class Submission(Resource):
             raise ValidationException('You may not submit to this phase '
                                       'because it is not currently active.')
 
-        self.requireParams('title', params)
-        title = self._getStrippedParam(params, 'title')
+        # The title itself is required by the route description
+        title = params['title'].strip()
+        if not title:
+            raise RestException('Parameter "title" must not be blank.')
 
         # Only users in the participant group (or with write access) may submit
         if phase['participantGroupId'] not in user['groups']:
-            self.model('phase', 'covalic').requireAccess(
+            self._phaseModel.requireAccess(
                 phase, user, level=AccessType.WRITE)
 
-
-        #approach = self._getStrippedParam(params, 'approach')
-
         # Site admins may override the submission creation date
         created = None
         if params['date'] is not None:
@@ -119,12 +144,10 @@ class Submission(Resource):
         if params['userId'] is not None:
             self.requireAdmin(user, 'Administrator access required to submit '
                                     'to this phase on behalf of another user.')
-            user = self.model('user').load(params['userId'], force=True,
-                                           exc=True)
-
-        submissionModel = self.model('submission', 'covalic')
+            user = self._userModel.load(params['userId'], force=True,
+                                        exc=True)
 
-        submission = submissionModel.createSubmission(
+        submission = self._submissionModel.createSubmission(
             creator=user,
             phase=phase,
             folder=folder,
@@ -134,167 +157,63 @@ class Submission(Resource):
             #approach=approach,
             meta=params.get('meta'))
 
-        apiUrl = os.path.dirname(cherrypy.url())
+        # Parent of this route's URL, built directly from the request
+        request = cherrypy.request
+        apiUrl = request.base + request.script_name + \
+            request.path_info.rsplit('/', 1)[0]
 
         try:
-            submission = submissionModel.scoreSubmission(submission, apiUrl)
+            submission = self._submissionModel.scoreSubmission(submission, apiUrl)
         except GirderException:
-            submissionModel.remove(submission)
+            self._submissionModel.remove(submission)
             raise
 
         return submission
 
     @access.public
+    @filtermodel(model=SubmissionModel)
     @autoDescribeRoute(
         Description('Post a score for a given submission.')
         .modelParam('id', model='submission', plugin='covalic')
         .jsonParam(
             'score', 'The JSON object containing the scores for this submission.',
             paramType='body',
-            schema={
-                "$schema": "http://json-schema.org/schema#",
-                'type': 'array',
-                'items': {'$ref': '#/definitions/score'},
-                'definitions': {
-                    'score': {
-                        'type': 'object',
-                        'properties': {
-                            'dataset': {'type': 'string'},
-                            'metrics': {
-                                'type': 'array',
-                                'items': {'$ref': '#/definitions/metric'}
-                            }
-                        },
-                        'required': ['dataset', 'metrics']
-                    },
-                    'metric': {
-                        'type': 'object',
-                        'properties': {
-                            'name': {'type': 'string'},
-                            'value': {'type': ['null', 'number', 'string']}
-                        },
-                        'required': ['name', 'value']
-                    }
-                }
-            })
+            requireArray=True)
         .notes('This should only be called by the scoring service, not by '
                'end users.')
         .errorResponse(('ID was invalid.',
                         'Invalid JSON passed in request body.'))
         .errorResponse('Admin access was denied for the challenge phase.', 403)
+        .errorResponse('Score is too large.', 413)
     )
     def postScore(self, submission, score, params):
-        # Ensure admin access on the containing challenge phase
-        phase = self.model('phase', 'covalic').load(
-            submission['phaseId'], user=self.getCurrentUser(), exc=True,
-            level=AccessType.ADMIN)
-
-        # Record whether submission is being re-scored
-        rescoring = 'overallScore' in submission
-
-        # Save document to trigger computing overall score
-        submission.pop('overallScore', None)
-        submission['score'] = score
-        submission = self.model('submission', 'covalic').save(submission)
-
-        #########################################################  step1
-
-
-        ############################################
-        ######### 第一次嘗試
-        from girder.models.upload import Upload
-        from girder.api.v1.file import File
-        from girder.utility import RequestBodyStream
-        import six
-
-
-        dest = dict(submission)
-        # for i in range(5000):
-        #     dest.setdefault(i, i + 20)
-
-        dest1 = str(dest)
-        size = len(dest1)
-
-        user = self.model('user').load(submission['creatorId'], force=True)
-        #str1 = submission['title']
-        # str2 = '.txt'
-        # name = "".join((str1, str2))
-        name = submission['title']
-
-        parentType = 'folder'
-        parentId = submission['folderId']
-        parent = self.model(parentType).load(
-            id=parentId, user=user, level=AccessType.ADMIN, exc=True)
-
-        mimeType = u'image/png'
-        reference = None
-
-        File().requireParams({'size': size})
-        assetstore = None
-
-        chunk = None
-        if size > 0 and cherrypy.request.headers.get('Content-Length'):
-            ct = cherrypy.request.body.content_type.value
-            #if (ct not in cherrypy.request.body.processors and
-             #       ct.split('/', 1)[0] not in cherrypy.request.body.processors):
-              #  chunk = RequestBodyStream(cherrypy.request.body)
-        if chunk is not None and chunk.getSize() <= 0:
-            chunk = None
+        # The body has already been parsed by this point; these checks keep
+        # oversized scores from being validated and written to the database
+        contentLength = int(cherrypy.request.headers.get('Content-Length', 0))
+        if contentLength > _MAX_SCORE_BODY_SIZE:
+            raise RestException('Score is too large.', code=413)
+        if len(score) > _MAX_SCORE_DATASETS:
+            raise RestException('Score has too many datasets.', code=413)
 
         try:
-            # TODO: This can be made more efficient by adding
-            #    save=chunk is None
-            # to the createUpload call parameters.  However, since this is
-            # a breaking change, that should be deferred until a major
-            # version upgrade.
-            upload = Upload().createUpload(
-                user=user, name=name, parentType=parentType, parent=parent, size=size,
-                mimeType=mimeType, reference=reference, assetstore=assetstore)
-        except OSError as exc:
-            if exc.errno == errno.EACCES:
-                raise GirderException(
-                    'Failed to create upload.', 'girder.api.v1.file.create-upload-failed')
-            raise
-        if upload['size'] > 0:
-            if chunk:
-                return Upload().handleChunk(upload, chunk, filter=True, user=user)
-
-        else:
-            return self._model.filter(Upload().finalizeUpload(upload), user)
-
-        offset = 0
-
-        if 'chunk' in params:
-            chunk = params['chunk']
-            if isinstance(chunk, cherrypy._cpreqbody.Part):
-                # Seek is the only obvious way to get the length of the part
-                chunk.file.seek(0, os.SEEK_END)
-                size = chunk.file.tell()
-                chunk.file.seek(0, os.SEEK_SET)
-                chunk = RequestBodyStream(chunk.file, size=size)
-        else:
-            chunk = RequestBodyStream(six.BytesIO(dest1), len(dest1))
-            #chunk = FileHandle(dest1)
-
-        if upload['userId'] != user['_id']:
-            raise AccessException('You did not initiate this upload.')
-
-        if upload['received'] != offset:
+            _SCORE_VALIDATOR.validate(score)
+        except jsonschema.ValidationError as exc:
             raise RestException(
-                'Server has received %s bytes, but client sent offset %s.' % (
-                    upload['received'], offset))
-        try:
-            Upload().handleChunk(upload, chunk, filter=True, user=user)
-        except IOError as exc:
-            if exc.errno == errno.EACCES:
-                raise Exception('Failed to store upload.')
-            raise
+                'Invalid JSON object for parameter score: %s' % exc.message)
+
+        # Ensure admin access on the containing challenge phase; only the ACL
+        # fields of the phase are needed for this
+        phase = self._phaseModel.load(
+            submission['phaseId'], force=True, exc=True,
+            fields=('_id', 'access', 'public'))
+        self._phaseModel.requireAccess(
+            phase, self.getCurrentUser(), level=AccessType.ADMIN)
 
-        ##########################################################################
+        submission = self._submissionModel.setScore(submission, score)
 
         # Delete the scoring user's job token since the job is now complete.
         token = self.getCurrentToken()
-        self.model('token').remove(token)
+        self._tokenModel.remove(token)
 
         return submission
 